@@ -0,0 +1,44 @@
+"""partial_indexes_on_users_status
+
+Revision ID: 047d526b2ce1
+Revises: 7aa95f7e1911
+Create Date: 2026-10-16 10:21:47.093114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '047d526b2ce1'
+down_revision: Union[str, Sequence[str], None] = '7aa95f7e1911'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('idx_users_active_verified')
+        batch_op.drop_index('idx_users_active')
+        batch_op.create_index(
+            'idx_users_active_true', ['id'], unique=False,
+            postgresql_where=sa.text('is_active = true')
+        )
+        batch_op.create_index(
+            'idx_users_active_unverified', ['created_at'], unique=False,
+            postgresql_where=sa.text('is_active = true AND is_verified = false')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('idx_users_active_unverified')
+        batch_op.drop_index('idx_users_active_true')
+        batch_op.create_index('idx_users_active', ['is_active'], unique=False)
+        batch_op.create_index(
+            'idx_users_active_verified', ['is_active', 'is_verified'], unique=False
+        )
@@ -0,0 +1,38 @@
+"""fragrance_id_server_default
+
+Revision ID: 3edf9a33c4fd
+Revises: 04e897ea84bc
+Create Date: 2026-10-16 09:12:41.208337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3edf9a33c4fd'
+down_revision: Union[str, Sequence[str], None] = '04e897ea84bc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # gen_random_uuid() is built in from Postgres 13, pgcrypto covers older servers
+    op.execute('CREATE EXTENSION IF NOT EXISTS "pgcrypto"')
+    with op.batch_alter_table('fragrances', schema=None) as batch_op:
+        batch_op.alter_column('id',
+               existing_type=sa.UUID(),
+               server_default=sa.text('gen_random_uuid()'),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('fragrances', schema=None) as batch_op:
+        batch_op.alter_column('id',
+               existing_type=sa.UUID(),
+               server_default=None,
+               existing_nullable=False)
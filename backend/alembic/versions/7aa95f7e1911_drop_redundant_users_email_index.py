@@ -0,0 +1,31 @@
+"""drop_redundant_users_email_index
+
+Revision ID: 7aa95f7e1911
+Revises: 3edf9a33c4fd
+Create Date: 2026-10-16 10:03:18.551927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7aa95f7e1911'
+down_revision: Union[str, Sequence[str], None] = '3edf9a33c4fd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # users_email_key (the UNIQUE constraint) already indexes email
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('idx_users_email')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('idx_users_email', ['email'], unique=False)
@@ -21,6 +21,7 @@ from app.schemas.frags import (
     create_user_profile,
     convert_recommendation_to_api,
     convert_similarity_recommendation_to_api,
+    similarity_reason,
     SaveProfileResponse,
     SaveQuizRatingsRequest,
     SaveOwnedFragrancesRequest
@@ -117,9 +118,9 @@ async def get_note_based_recommendations(
         # Create user profile summary
         user_profile = create_user_profile(request.preferred_notes, request.preferred_accords)
         
-        # Convert internal results to API response format
+        # Convert internal results to API response format (the profile carries the preference sets)
         api_recommendations = [
-            convert_recommendation_to_api(rec, rank + 1, request.preferred_notes, request.preferred_accords)
+            convert_recommendation_to_api(rec, rank + 1, user_profile)
             for rank, rec in enumerate(recommendations)
         ]
         
@@ -212,8 +213,9 @@ async def get_similar_fragrances(
         )
         
         # Convert to API response format using the new conversion function
+        primary_reason = similarity_reason(target_fragrances_info)
         api_recommendations = [
-            convert_similarity_recommendation_to_api(rec, rank + 1, target_fragrances_info)
+            convert_similarity_recommendation_to_api(rec, rank + 1, primary_reason)
             for rank, rec in enumerate(recommendations)
         ]
         
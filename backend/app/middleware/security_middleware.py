@@ -21,7 +21,9 @@ class RateLimiter:
 
     def is_allowed(self, client_id: str) -> tuple[bool, int]:
         
-        now = time.time()
+        # Only intervals matter here, so use the monotonic clock - wall-clock jumps
+        # (NTP, DST on a misconfigured host) can't empty or freeze the window
+        now = time.monotonic()
         minute_ago = now - 60
 
         # Clean old requests
@@ -1,12 +1,13 @@
 import math
+import sys
 import logging
 from typing import List, Dict, Tuple, Set, Optional, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from collections import defaultdict, Counter
-from .base import Fragrance, RecommendationResult, NotePreference
+from .base import Fragrance, RecommendationResult, NotePreference, format_quality_note
 
 
-@dataclass
+@dataclass(slots=True)
 class Fragrance:
    
     id: str  # Changed to str to handle UUIDs properly
@@ -19,9 +20,13 @@ class Fragrance:
     accords: List[str]  
     avg_rating: float  # 1-5 scale
     num_ratings: int
+    quality_note: Optional[str] = field(init=False, default=None)
 
+    def __post_init__(self):
+        self.quality_note = format_quality_note(self.avg_rating, self.num_ratings)
 
-@dataclass 
+
+@dataclass(slots=True)
 class RecommendationResult:
    
     fragrance: Fragrance
@@ -29,7 +34,7 @@ class RecommendationResult:
     explanation: Dict[str, float]  # Component scores for transparency
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NotePreference:
     
     name: str
@@ -476,11 +481,13 @@ class SimilarityRecommender:
         if not note_list:
             return []
         
+        # Notes and accords are a small closed vocabulary - intern them so every
+        # fragrance shares one string object per name
         if isinstance(note_list, list):
-            return [str(note).strip().lower() for note in note_list if note and str(note).strip()]
+            return [sys.intern(str(note).strip().lower()) for note in note_list if note and str(note).strip()]
         
         # Fallback to string parsing if somehow it's still a string
         if isinstance(note_list, str):
-            return [note.strip().lower() for note in note_list.split(',') if note.strip()]
+            return [sys.intern(note.strip().lower()) for note in note_list.split(',') if note.strip()]
         
         return []
\ No newline at end of file
@@ -1,9 +1,16 @@
 
-from typing import List, Dict
-from dataclasses import dataclass
+from typing import List, Dict, Optional
+from dataclasses import dataclass, field
 
 
-@dataclass
+def format_quality_note(avg_rating: float, num_ratings: int) -> Optional[str]:
+    """'Highly rated' blurb shown with well-reviewed fragrances, None otherwise"""
+    if avg_rating >= 4.0 and num_ratings >= 100:
+        return f"Highly rated ({avg_rating:.1f}/5 from {num_ratings:,} reviews)"
+    return None
+
+
+@dataclass(slots=True)
 class Fragrance:
   
     id: str  # Change from int to str to handle UUIDs
@@ -16,15 +23,20 @@ class Fragrance:
     accords: List[str]  
     avg_rating: float  # 1-5 scale
     num_ratings: int
+    # "Highly rated" blurb for the API, formatted once per fragrance instead of per recommendation
+    quality_note: Optional[str] = field(init=False, default=None)
+
+    def __post_init__(self):
+        self.quality_note = format_quality_note(self.avg_rating, self.num_ratings)
 
-@dataclass 
+@dataclass(slots=True)
 class RecommendationResult:
     
     fragrance: Fragrance
     score: float
     explanation: Dict[str, float]  # Component scores for transparency
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NotePreference:
     
     name: str
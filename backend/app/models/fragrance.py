@@ -101,7 +101,7 @@ class Fragrance(Base):
     id = Column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        server_default=func.gen_random_uuid(),
         nullable=False,
         comment="Unique fragrance identifier"
     )
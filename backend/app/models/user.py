@@ -1,7 +1,7 @@
 import uuid
 
 from app.core.database import Base
-from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
@@ -101,9 +101,13 @@ class User(Base):
 
     # Database Indexes for Performance
     __table_args__ = (
-        Index("idx_users_email", "email"),
-        Index("idx_users_active", "is_active"),
-        Index("idx_users_active_verified", "is_active", "is_verified"),
+        # Partial indexes: boolean btrees are too unselective to be useful
+        Index("idx_users_active_true", "id", postgresql_where=text("is_active = true")),
+        Index(
+            "idx_users_active_unverified",
+            "created_at",
+            postgresql_where=text("is_active = true AND is_verified = false"),
+        ),
         Index("idx_users_created_at", "created_at"),
         Index("idx_users_display_name", "display_name"),
     )
@@ -111,20 +115,30 @@ class User(Base):
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email={self.email}, active={self.is_active})>"
 
+    # Columns serialized by to_dict, in output order
+    _DICT_COLS = (
+        "id",
+        "email",
+        "display_name",
+        "first_name",
+        "last_name",
+        "is_active",
+        "is_verified",
+        "created_at",
+        "last_login",
+        "bio",
+        "avatar_url",
+    )
+    _DICT_DT_COLS = ("created_at", "last_login")
+
     def to_dict(self) -> dict:
-        return {
-            "id": str(self.id),
-            "email": self.email,
-            "display_name": self.display_name,
-            "first_name": self.first_name,
-            "last_name": self.last_name,
-            "is_active": self.is_active,
-            "is_verified": self.is_verified,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "last_login": self.last_login.isoformat() if self.last_login else None,
-            "bio": self.bio,
-            "avatar_url": self.avatar_url,
-        }
+        # Attribute access, so expired or deferred columns still load
+        data = {col: getattr(self, col) for col in self._DICT_COLS}
+        data["id"] = str(data["id"])
+        for col in self._DICT_DT_COLS:
+            value = data[col]
+            data[col] = value.isoformat() if value else None
+        return data
 
     @property
     def full_name(self) -> str:
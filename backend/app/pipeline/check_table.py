@@ -5,9 +5,10 @@ Quick script to check if fragrances table exists and show its structure
 
 import sys
 import os
+from functools import lru_cache
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import create_engine, text
 
 def get_db_url():
     """Get database URL from environment"""
@@ -24,42 +25,67 @@ def get_db_url():
     
     return f"postgresql://{username}:{password}@{hostname}:{port}/{name}"
 
-def check_table_exists():
+@lru_cache(maxsize=None)
+def describe_table(db_url, table_name):
+    """Fetch table list, columns and indexes over a single connection"""
+    engine = create_engine(db_url)
+    try:
+        with engine.connect() as conn:
+            tables = conn.execute(text("""
+                SELECT table_name FROM information_schema.tables
+                WHERE table_schema = 'public' AND table_type = 'BASE TABLE'
+            """)).scalars().all()
+            
+            if not conn.execute(text("SELECT to_regclass(:table_name) IS NOT NULL"), {"table_name": table_name}).scalar():
+                return tables, None, None, None
+            
+            # Columns and indexes in one round-trip, tagged by kind
+            rows = conn.execute(text("""
+                SELECT 'column' AS kind, column_name::text AS name, data_type::text AS detail,
+                       is_nullable::text AS extra, ordinal_position::int AS position
+                FROM information_schema.columns
+                WHERE table_schema = 'public' AND table_name = :table_name
+                UNION ALL
+                SELECT 'index', indexname::text, indexdef, NULL, NULL
+                FROM pg_indexes
+                WHERE schemaname = 'public' AND tablename = :table_name
+                ORDER BY kind, position, name
+            """), {"table_name": table_name}).fetchall()
+            
+            row_count = conn.execute(text(f'SELECT COUNT(*) FROM "{table_name}"')).scalar()
+    finally:
+        engine.dispose()
     
+    columns = [row for row in rows if row.kind == 'column']
+    indexes = [row for row in rows if row.kind == 'index']
+    return tables, columns, indexes, row_count
+
+def check_table_exists():
     
-    engine = create_engine(get_db_url())
-    inspector = inspect(engine)
     
-    # Check if table exists
-    tables = inspector.get_table_names()
+    tables, columns, indexes, row_count = describe_table(get_db_url(), 'fragrances')
     
     print(f" Database contains {len(tables)} tables:")
     for table in sorted(tables):
         print(f"  - {table}")
     
-    if 'fragrances' in tables:
+    if columns is not None:
         print("\n fragrances table EXISTS!")
         
-        # Get table structure
-        columns = inspector.get_columns('fragrances')
+        # Table structure
         print(f"\n fragrances table has {len(columns)} columns:")
         
         for col in columns:
-            nullable = "NULL" if col['nullable'] else "NOT NULL"
-            print(f"  - {col['name']}: {col['type']} ({nullable})")
+            nullable = "NULL" if col.extra == 'YES' else "NOT NULL"
+            print(f"  - {col.name}: {col.detail} ({nullable})")
         
-        # Get indexes
-        indexes = inspector.get_indexes('fragrances')
+        # Indexes
         print(f"\n fragrances table has {len(indexes)} indexes:")
         for idx in indexes:
-            unique = "UNIQUE" if idx['unique'] else ""
-            print(f"  - {idx['name']}: {idx['column_names']} {unique}")
+            print(f"  - {idx.name}: {idx.detail}")
         
-        # Count rows
-        with engine.connect() as conn:
-            result = conn.execute(text("SELECT COUNT(*) FROM fragrances"))
-            row_count = result.scalar()
-            print(f"\n fragrances table contains {row_count} rows")
+        # Row count
+        print(f"\n fragrances table contains {row_count} rows")
     
     else:
         print("\n fragrances table does NOT exist")
@@ -3,25 +3,57 @@
 Simple ETL Pipeline - Uses your already downloaded dataset
 """
 
+import argparse
+import asyncio
+import codecs
+import csv
+import io
 import os
 import sys
 import pandas as pd
 import numpy as np
+import asyncpg
 from pathlib import Path
-from datetime import datetime
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.dialects.postgresql import insert
-import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+import psycopg2
+from psycopg2.extras import execute_values
+from sqlalchemy import create_engine
 
 # Add to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-from ..core.database import Base
-from ..models.fragrance import Fragrance
 from ..core.config import settings
 
+# Copy-on-Write is always on from pandas 3; opt in on 2.x so column reassignments never
+# touch the caller's frame and the stages can skip defensive copies
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Prefer the multithreaded Arrow CSV reader, fall back to pandas' C tokenizer
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pc = pq = pa_csv = None
+
+# DuckDB's vectorized CSV scanner is faster still, when installed
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Source columns transform_data reads - every reader projects the file down to these
+SOURCE_COLUMNS = [
+    'url', 'Perfume', 'Brand', 'Gender', 'Rating Value', 'Rating Count', 'Year',
+    'Top', 'Middle', 'Base', 'Perfumer1', 'Perfumer2',
+    'mainaccord1', 'mainaccord2', 'mainaccord3', 'mainaccord4', 'mainaccord5'
+]
+
 def get_sync_db_url():
    
     async_url = settings.database_url
@@ -29,7 +61,176 @@ def get_sync_db_url():
         return async_url.replace("postgresql+asyncpg://", "postgresql://")
     return async_url
 
-def load_csv_data():
+def read_csv_duckdb(csv_file, chunksize=None):
+    """Parse the CSV with DuckDB's parallel reader (utf-8 input only)"""
+    con = duckdb.connect()
+    try:
+        # Explicit all-VARCHAR columns: nothing is type-inferred (so a stray "circa 1990" year or a
+        # "t" accord can't be rejected or turned into a bool) and the sniffer isn't run at all.
+        # Malformed rows are skipped into reject tables, counted below, never silently
+        header = read_csv_header(csv_file, 'utf-8')
+        relation = con.read_csv(
+            str(csv_file), sep=';', quotechar='"', encoding='utf-8', header=True, auto_detect=False,
+            columns={col: 'VARCHAR' for col in header}, store_rejects=True
+        )
+        # Drop the spaces after each ';' as pandas' skipinitialspace did; a blank field is NULL
+        relation = relation.project(', '.join(
+            f'nullif(ltrim("{col}"), \'\') AS "{col}"' for col in header if col in SOURCE_COLUMNS
+        ))
+        if not chunksize:
+            frames = [relation.df()]
+            report_duckdb_rejects(con)
+            yield frames.pop()  # no reference left here while suspended
+            return
+        
+        # DuckDB hands results back in 2048-row vectors, so fetch enough of them to cover
+        # a chunk and re-slice into chunksize-row frames
+        vectors_per_chunk = -(-chunksize // 2048)
+        pending = None
+        while True:
+            fetched = relation.fetch_df_chunk(vectors_per_chunk)
+            if fetched is None or fetched.empty:
+                break
+            pending = fetched if pending is None else pd.concat([pending, fetched], ignore_index=True)
+            while len(pending) >= chunksize:
+                yield pending.iloc[:chunksize].reset_index(drop=True)
+                pending = pending.iloc[chunksize:]
+        if pending is not None and not pending.empty:
+            yield pending.reset_index(drop=True)
+        report_duckdb_rejects(con)
+    finally:
+        con.close()
+
+def report_duckdb_rejects(con):
+    """Log how many lines DuckDB skipped; a utf-8 decode failure is an error, not a skipped row"""
+    rejects = con.sql("SELECT error_type, count(DISTINCT line) FROM reject_errors GROUP BY error_type").fetchall()
+    counts = dict(rejects)
+    if 'INVALID ENCODING' in counts:
+        raise UnicodeError(f"{counts['INVALID ENCODING']} lines are not valid utf-8")
+    for error_type, lines in rejects:
+        print(f"Skipped {lines} malformed lines ({error_type.lower()})")
+
+def read_csv_header(csv_file, encoding):
+    """Column names from the CSV's first line"""
+    with open(csv_file, encoding=encoding, newline='') as f:
+        return next(csv.reader(f, delimiter=';', quotechar='"'), [])
+
+def strip_initial_spaces(table):
+    """Drop the spaces after each ';' that pandas' skipinitialspace used to skip; a blank field is null"""
+    columns = []
+    for column in table.columns:
+        if pa.types.is_string(column.type):
+            column = pc.utf8_ltrim(column, characters=' ')
+            column = pc.if_else(pc.equal(column, ''), pa.scalar(None, pa.string()), column)
+        columns.append(column)
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+def read_csv_arrow(csv_file, encoding):
+    """Parse the CSV with Arrow's multithreaded reader, skipping malformed rows"""
+    # include_columns rejects names the file doesn't have, so project against the header
+    columns = [col for col in read_csv_header(csv_file, encoding) if col in SOURCE_COLUMNS]
+    table = pa_csv.read_csv(
+        csv_file,
+        read_options=pa_csv.ReadOptions(encoding=encoding),
+        parse_options=pa_csv.ParseOptions(delimiter=';', quote_char='"', invalid_row_handler=lambda row: 'skip'),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns,
+            strings_can_be_null=True  # empty fields are NaN, as in pandas
+        )
+    )
+    return strip_initial_spaces(table).to_pandas(types_mapper=pd.ArrowDtype)
+
+def read_csv_arrow_stream(csv_file, encoding, chunksize):
+    """Stream the CSV through Arrow's incremental reader in frames of chunksize rows"""
+    columns = [col for col in read_csv_header(csv_file, encoding) if col in SOURCE_COLUMNS]
+    reader = pa_csv.open_csv(
+        csv_file,
+        read_options=pa_csv.ReadOptions(encoding=encoding),
+        parse_options=pa_csv.ParseOptions(delimiter=';', quote_char='"', invalid_row_handler=lambda row: 'skip'),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns,
+            # Types are only inferred from the first block, so read everything as text
+            column_types={col: pa.string() for col in columns},
+            strings_can_be_null=True
+        )
+    )
+    
+    # Blocks are sized in bytes, so re-slice them into chunksize-row tables
+    pending = None
+    for batch in reader:
+        batch_table = strip_initial_spaces(pa.Table.from_batches([batch]))
+        pending = batch_table if pending is None else pa.concat_tables([pending, batch_table])
+        while pending.num_rows >= chunksize:
+            yield pending.slice(0, chunksize).to_pandas(types_mapper=pd.ArrowDtype)
+            pending = pending.slice(chunksize)
+    if pending is not None and pending.num_rows:
+        yield pending.to_pandas(types_mapper=pd.ArrowDtype)
+
+def read_csv_chunks(csv_file, encoding, chunksize=None):
+    """Yield the parsed CSV as one frame, or as frames of chunksize rows"""
+    if duckdb is not None and encoding == 'utf-8':
+        yield from read_csv_duckdb(csv_file, chunksize)
+        return
+    
+    # Arrow transcodes any encoding itself, and streams blocks for chunked reads
+    if pa_csv is not None:
+        if chunksize:
+            yield from read_csv_arrow_stream(csv_file, encoding, chunksize)
+        else:
+            yield read_csv_arrow(csv_file, encoding)
+        return
+    
+    read_csv = partial(
+        pd.read_csv,
+        csv_file, 
+        encoding=encoding,
+        delimiter=';',           # Use semicolon as delimiter
+        quotechar='"',           # Handle quoted fields
+        on_bad_lines='skip',     # Skip malformed lines
+        usecols=lambda col: col in SOURCE_COLUMNS,
+        engine='c',
+        skipinitialspace=True
+    )
+    if chunksize:
+        yield from read_csv(chunksize=chunksize)
+    else:
+        yield read_csv()
+
+def read_parquet_cache(parquet_file, chunksize=None):
+    """Yield the cached dataset, reading only the columns the transform uses"""
+    parquet = pq.ParquetFile(parquet_file)
+    columns = [col for col in SOURCE_COLUMNS if col in parquet.schema_arrow.names]
+    if not chunksize:
+        yield parquet.read(columns=columns).to_pandas(types_mapper=pd.ArrowDtype)
+        return
+    
+    for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas(types_mapper=pd.ArrowDtype)
+
+def write_parquet_cache(df, parquet_file):
+    """Save the parsed CSV beside the original so later runs skip parsing it"""
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, parquet_file, compression='zstd', use_dictionary=True)
+        print(f"Cached dataset as {parquet_file.name}")
+    except Exception as e:
+        print(f"Could not write Parquet cache: {e}")
+
+def csv_decodes(csv_file, encoding):
+    """Whether the whole file decodes under encoding, checked block by block without parsing"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        with open(csv_file, 'rb') as f:
+            for block in iter(partial(f.read, 1 << 20), b''):
+                decoder.decode(block)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError as e:
+        print(f"Failed with {encoding}: {e}")
+        return False
+    return True
+
+def load_csv_data(chunksize=None):
+    """Yield the dataset as DataFrames - the whole file at once unless chunksize is given"""
     
     # Path to your downloaded dataset
     csv_path = Path(r"C:\Users\Varun\.cache\kagglehub\datasets\olgagmiufana1\fragrantica-com-fragrance-dataset\versions\3")
@@ -40,77 +241,106 @@ def load_csv_data():
         raise FileNotFoundError(f"No CSV files found in {csv_path}")
     
     csv_file = csv_files[0]
+    
+    # Reuse the Parquet cache unless the CSV has changed since it was written. Versioned so caches
+    # from the old type-inferring DuckDB read, which could drop rows, are never picked up
+    parquet_file = csv_file.with_suffix('.v2.parquet')
+    if pq is not None and parquet_file.exists() and parquet_file.stat().st_mtime >= csv_file.stat().st_mtime:
+        print(f"Loading cached Parquet: {parquet_file.name}")
+        yield from read_parquet_cache(parquet_file, chunksize)
+        return
+    
     print(f"Loading CSV: {csv_file.name}")
     
-    # Try different encodings with semicolon delimiter
-    for encoding in ['latin1', 'utf-8', 'cp1252']:
+    # Try different encodings with semicolon delimiter (utf-8 first, it's the tokenizer's fast path)
+    for encoding in ['utf-8', 'latin1', 'cp1252']:
+        # Settle the encoding over the whole file before anything is yielded - in chunked runs
+        # earlier chunks are already loaded by the time a bad byte deep in the file would surface
+        if not csv_decodes(csv_file, encoding):
+            continue
         try:
-            df = pd.read_csv(
-                csv_file, 
-                encoding=encoding,
-                delimiter=';',           # Use semicolon as delimiter
-                quotechar='"',           # Handle quoted fields
-                skipinitialspace=True,   # Skip spaces after delimiter
-                on_bad_lines='skip',     # Skip malformed lines
-                engine='python'          # More flexible parser
-            )
-            print(f"Successfully loaded with {encoding} encoding")
-            print(f"Shape: {df.shape}")
-            print(f"Columns: {list(df.columns)}")
-            
-            # Show first few rows to understand structure
-            print("\nFirst few rows:")
-            print(df.head())
-            
-            return df
+            chunks = read_csv_chunks(csv_file, encoding, chunksize)
+            df = next(chunks)
         except Exception as e:
             print(f"Failed with {encoding}: {e}")
             continue
+        
+        print(f"Successfully loaded with {encoding} encoding")
+        print(f"Shape: {df.shape}")
+        print(f"Columns: {list(df.columns)}")
+        
+        # Show first few rows to understand structure
+        print("\nFirst few rows:")
+        print(df.head())
+        
+        # Only whole-file reads are cached, chunked runs never hold the full table
+        if pq is not None and not chunksize:
+            write_parquet_cache(df, parquet_file)
+        
+        # Hand the frame over without keeping a reference in this suspended generator, so
+        # the caller can free it (for whole-file reads, the entire raw table) before loading
+        first = [df]
+        del df
+        yield first.pop()
+        yield from chunks
+        return
     
     raise RuntimeError("Could not read CSV with any encoding")
 
-def parse_notes(notes_string):
-    
-    if pd.isna(notes_string) or notes_string == '':
-        return []
+def parse_notes(notes):
     
-    # Split by common delimiters and clean
-    notes = str(notes_string).replace(',', ' ').split()
-    # Remove empty strings and clean up
-    notes = [note.strip() for note in notes if note.strip()]
-    return notes
+    # Split a whole notes column by common delimiters in one Series.str pass.
+    # Cast to object first - Arrow's whitespace split keeps empty tokens, str.split() doesn't
+    notes = notes.fillna('').astype(object).str.replace(',', ' ', regex=False).str.split()
+    return notes.tolist()
 
 def parse_perfumer(perfumer1, perfumer2):
     
-    perfumers = []
-    
-    if pd.notna(perfumer1) and perfumer1 != 'unknown':
-        perfumers.append(str(perfumer1).strip())
-    
-    if pd.notna(perfumer2) and perfumer2 != 'unknown':
-        perfumers.append(str(perfumer2).strip())
-    
-    return perfumers
+    # Mask out missing/'unknown' perfumers column-wise, then pair the two arrays up
+    perfumers = [
+        column.astype(object).where(column.notna() & (column != 'unknown')).str.strip().to_numpy()
+        for column in (perfumer1, perfumer2)
+    ]
+    return [[name for name in pair if isinstance(name, str)] for pair in zip(*perfumers)]
+
+def parse_main_accords(accords):
+    
+    # One sweep over the stacked accord columns as a 2-D object array, no per-row Series
+    values = accords.to_numpy(dtype=object)
+    present = pd.notna(values)
+    return [
+        [str(accord).strip() for accord, keep in zip(row, keep_row) if keep and accord != '']
+        for row, keep_row in zip(values, present)
+    ]
 
-def parse_main_accords(*accords):
+def drop_duplicate_fragrances(df_clean):
+    """Dedupe on the unique constraints, keeping the most-rated row of each group"""
+    print("Removing duplicates...")
+    rows_before = len(df_clean)
+    
+    # Rank by rating count/value on just the key columns; stable sort keeps file order among ties
+    keys = df_clean[['url', 'name', 'brand_name', 'total_ratings', 'average_rating']].reset_index(drop=True)
+    keys = keys.sort_values(['total_ratings', 'average_rating'], ascending=False, kind='stable')
     
-    main_accords = []
+    # First find URL duplicates
+    url_first = ~keys.duplicated(subset=['url'])
+    print(f"After removing URL duplicates: {url_first.sum()} rows ({rows_before - url_first.sum()} collapsed)")
     
-    for accord in accords:
-        if pd.notna(accord) and accord != '':
-            main_accords.append(str(accord).strip())
+    # Then name+brand duplicates among the surviving rows
+    name_brand_first = ~keys[url_first].duplicated(subset=['name', 'brand_name'])
+    print(f"After removing name+brand duplicates: {name_brand_first.sum()} rows ({url_first.sum() - name_brand_first.sum()} collapsed)")
     
-    return main_accords
+    # Filter the full frame once, in its original row order
+    keep = np.zeros(len(df_clean), dtype=bool)
+    keep[name_brand_first.index[name_brand_first]] = True
+    return df_clean[keep]
 
-def transform_data(df):
+def transform_data(df, deduplicate=True):
     
     print("Transforming data...")
     
-    # Create a copy
-    df_clean = df.copy()
-    
     # Check what columns we have
-    print("Available columns:", list(df_clean.columns))
+    print("Available columns:", list(df.columns))
     
     # Map columns based on the CSV structure you showed
     column_mapping = {
@@ -124,13 +354,14 @@ def transform_data(df):
         'Year': 'release_year'
     }
     
-    # Apply basic column mapping for existing columns
-    for old_col, new_col in column_mapping.items():
-        if old_col in df_clean.columns:
-            df_clean[new_col] = df_clean[old_col]
+    # Rename rather than copy - the result shares the source columns' buffers
+    df_clean = df.rename(columns=column_mapping)
+    
+    # Source columns as a set, so the presence checks below are hash lookups
+    cols = set(df_clean.columns)
     
     # Check for required columns
-    if 'url' not in df_clean.columns or 'Perfume' not in df_clean.columns:
+    if 'url' not in cols or 'name' not in cols:
         print("Error: Required columns 'url' or 'Perfume' not found")
         return None
     
@@ -138,27 +369,24 @@ def transform_data(df):
     df_clean = df_clean.dropna(subset=['name', 'url'])
     print(f"After removing rows with missing name/url: {len(df_clean)} rows")
     
-    # Remove duplicates based on the unique constraints
-    print("Removing duplicates...")
-    # First remove URL duplicates
-    df_clean = df_clean.drop_duplicates(subset=['url'], keep='first')
-    print(f"After removing URL duplicates: {len(df_clean)} rows")
-    
-    # Then remove name+brand duplicates  
-    df_clean = df_clean.drop_duplicates(subset=['name', 'brand_name'], keep='first')
-    print(f"After removing name+brand duplicates: {len(df_clean)} rows")
-    
     # Handle rating conversion
-    if 'average_rating' in df_clean.columns:
+    if 'average_rating' in cols:
         print(f"Before conversion - sample ratings: {df_clean['average_rating'].head().tolist()}")
         print(f"Rating data type: {df_clean['average_rating'].dtype}")
         
-        # Handle European decimal format (comma to dot)
-        if df_clean['average_rating'].dtype == 'object':
-            df_clean['average_rating'] = df_clean['average_rating'].astype(str).str.replace(',', '.')
+        # Handle European decimal format (comma to dot). Arrow strings are replaced and cast
+        # in Arrow kernels; unparseable values drop back to pandas' coercing path
+        rating = df_clean['average_rating']
+        if isinstance(rating.dtype, pd.ArrowDtype) and pa.types.is_string(rating.dtype.pyarrow_dtype):
+            try:
+                rating = rating.str.replace(',', '.', regex=False).astype(pd.ArrowDtype(pa.float64())).astype('float64')
+            except ValueError:
+                pass
+        if not pd.api.types.is_numeric_dtype(rating):
+            rating = rating.astype(str).str.replace(',', '.')
         
         # Convert to numeric
-        df_clean['average_rating'] = pd.to_numeric(df_clean['average_rating'], errors='coerce')
+        df_clean['average_rating'] = pd.to_numeric(rating, errors='coerce')
         
         print(f"After conversion - sample ratings: {df_clean['average_rating'].head().tolist()}")
         print(f"Rating range: {df_clean['average_rating'].min()} to {df_clean['average_rating'].max()}")
@@ -172,69 +400,77 @@ def transform_data(df):
         df_clean['average_rating'] = 0.0
     
     # Handle total_ratings
-    if 'total_ratings' in df_clean.columns:
+    if 'total_ratings' in cols:
         df_clean['total_ratings'] = pd.to_numeric(df_clean['total_ratings'], errors='coerce')
         df_clean['total_ratings'] = df_clean['total_ratings'].fillna(0)
     else:
         df_clean['total_ratings'] = 0
     
+    # Remove duplicates once the ranking columns are numeric
+    if deduplicate:
+        df_clean = drop_duplicate_fragrances(df_clean)
+    
     # Handle release year
-    if 'release_year' in df_clean.columns:
-        df_clean['release_year'] = pd.to_numeric(df_clean['release_year'], errors='coerce')
-        # Set unrealistic years to None
-        df_clean.loc[(df_clean['release_year'] < 1800) | (df_clean['release_year'] > 2030), 'release_year'] = None
+    if 'release_year' in cols:
+        release_year = pd.to_numeric(df_clean['release_year'], errors='coerce')
+        # Set unrealistic years to None, then store as nullable Int16 (in range once masked)
+        release_year = release_year.mask((release_year < 1800) | (release_year > 2030))
+        df_clean['release_year'] = release_year.round().astype('Int16')
     
     # Parse notes
-    if 'Top' in df_clean.columns:
-        df_clean['top_notes'] = df_clean['Top'].apply(parse_notes)
+    if 'Top' in cols:
+        df_clean['top_notes'] = parse_notes(df_clean['Top'])
     else:
         df_clean['top_notes'] = [[] for _ in range(len(df_clean))]
     
-    if 'Middle' in df_clean.columns:
-        df_clean['middle_notes'] = df_clean['Middle'].apply(parse_notes)
+    if 'Middle' in cols:
+        df_clean['middle_notes'] = parse_notes(df_clean['Middle'])
     else:
         df_clean['middle_notes'] = [[] for _ in range(len(df_clean))]
     
-    if 'Base' in df_clean.columns:
-        df_clean['base_notes'] = df_clean['Base'].apply(parse_notes)
+    if 'Base' in cols:
+        df_clean['base_notes'] = parse_notes(df_clean['Base'])
     else:
         df_clean['base_notes'] = [[] for _ in range(len(df_clean))]
     
     # Parse perfumers
-    if 'Perfumer1' in df_clean.columns and 'Perfumer2' in df_clean.columns:
-        df_clean['perfumer'] = df_clean.apply(lambda row: parse_perfumer(row['Perfumer1'], row['Perfumer2']), axis=1)
+    if 'Perfumer1' in cols and 'Perfumer2' in cols:
+        df_clean['perfumer'] = parse_perfumer(df_clean['Perfumer1'], df_clean['Perfumer2'])
     else:
         df_clean['perfumer'] = [[] for _ in range(len(df_clean))]
     
     # Parse main accords
     accord_columns = ['mainaccord1', 'mainaccord2', 'mainaccord3', 'mainaccord4', 'mainaccord5']
-    available_accords = [col for col in accord_columns if col in df_clean.columns]
+    available_accords = [col for col in accord_columns if col in cols]
     
     if available_accords:
-        df_clean['main_accords'] = df_clean[available_accords].apply(lambda row: parse_main_accords(*row), axis=1)
+        df_clean['main_accords'] = parse_main_accords(df_clean[available_accords])
     else:
         df_clean['main_accords'] = [[] for _ in range(len(df_clean))]
     
     # Add missing columns with defaults
-    if 'brand_name' not in df_clean.columns:
+    if 'brand_name' not in cols:
         df_clean['brand_name'] = 'Unknown'
     else:
         # Clean brand_name
         df_clean['brand_name'] = df_clean['brand_name'].fillna('Unknown')
     
-    if 'gender' not in df_clean.columns:
+    if 'gender' not in cols:
         df_clean['gender'] = 'unisex'
     else:
-        # Clean gender values
-        df_clean['gender'] = df_clean['gender'].str.lower().fillna('unisex')
-        # Map common variations
+        # Clean gender values - only a handful of distinct values, so factorize once,
+        # normalize the uniques and remap the integer codes (NaN's -1 lands on 'unisex')
         gender_mapping = {
             'women': 'female',
             'men': 'male',
             'for women': 'female',
             'for men': 'male'
         }
-        df_clean['gender'] = df_clean['gender'].replace(gender_mapping)
+        codes, uniques = pd.factorize(df_clean['gender'])
+        labels = [gender_mapping.get(str(value).lower(), str(value).lower()) for value in uniques] + ['unisex']
+        categories = list(dict.fromkeys(labels))
+        label_codes = np.array([categories.index(label) for label in labels])
+        df_clean['gender'] = pd.Categorical.from_codes(label_codes[codes], categories=categories)
     
     # Add missing optional fields with defaults
     optional_fields = {
@@ -247,23 +483,20 @@ def transform_data(df):
     }
     
     for field, default_value in optional_fields.items():
-        if field not in df_clean.columns:
+        if field not in cols:
             df_clean[field] = default_value
     
-    # Add timestamps, IDs, and discontinued status
-    df_clean['created_at'] = datetime.now()
-    df_clean['updated_at'] = datetime.now()
-    df_clean['id'] = [str(uuid.uuid4()) for _ in range(len(df_clean))]
+    # Add discontinued status (ids and timestamps come from the column server defaults)
     df_clean['discontinued'] = False  # Add discontinued column with default False
     
     # Select final columns matching the database schema
-    final_columns = ['id', 'name', 'brand_name', 'brand_id', 'release_year', 'gender', 
+    final_columns = ['name', 'brand_name', 'brand_id', 'release_year', 'gender', 
                      'concentration', 'perfumer', 'top_notes', 'middle_notes', 'base_notes', 
                      'main_accords', 'average_rating', 'total_ratings', 'longevity_rating', 
-                     'sillage_rating', 'description', 'image_url', 'discontinued', 
-                     'created_at', 'updated_at', 'url']
+                     'sillage_rating', 'description', 'image_url', 'discontinued', 'url']
     
-    df_final = df_clean[final_columns].copy()
+    # Projection only - under copy-on-write the selected columns aren't copied
+    df_final = df_clean[final_columns]
     
     print(f"Final dataset shape: {df_final.shape}")
     print(f"Sample transformed data:")
@@ -271,160 +504,255 @@ def transform_data(df):
     
     return df_final
 
+def drop_seen_fragrances(df, seen_urls, seen_name_brands):
+    """Drop rows whose url or name+brand appeared in an earlier chunk, then record this chunk's keys"""
+    name_brand = pd.Series(list(zip(df['name'], df['brand_name'])), index=df.index)
+    df = df[~df['url'].isin(seen_urls) & ~name_brand.isin(seen_name_brands)]
+    seen_urls.update(df['url'])
+    seen_name_brands.update(zip(df['name'], df['brand_name']))
+    return df
+
+def transform_data_parallel(df, executor=None, max_workers=1):
+    """Run transform_data over row chunks on the process pool and stitch the results"""
+    if executor is None or max_workers <= 1 or len(df) < max_workers:
+        return transform_data(df)
+    
+    chunk_size = -(-len(df) // max_workers)
+    chunks = [df.iloc[i:i + chunk_size] for i in range(0, len(df), chunk_size)]
+    print(f"Transforming {len(df)} rows in {len(chunks)} chunks across {max_workers} workers...")
+    
+    results = list(executor.map(partial(transform_data, deduplicate=False), chunks))
+    
+    if any(result is None for result in results):
+        return None
+    
+    # Workers only see their own rows, so dedupe across the stitched frame
+    return drop_duplicate_fragrances(pd.concat(results))
+
 def load_to_database(df):
     """Load data to your database"""
     print("Loading to database...")
     
     engine = create_engine(get_sync_db_url())
-    SessionLocal = sessionmaker(bind=engine)
+    connection = engine.raw_connection()
     
-    session = SessionLocal()
     try:
-        # Convert to records
-        records = df.to_dict('records')
+        # Sanitize column-wise once so records come out as Python natives with None for NULL
+        df['average_rating'] = df['average_rating'].fillna(0).astype(float)
+        df['total_ratings'] = df['total_ratings'].fillna(0).astype('Int64')
+        df['release_year'] = df['release_year'].astype('Int64')
+        df['brand_name'] = df['brand_name'].fillna('Unknown')
+        df['gender'] = df['gender'].fillna('unisex')
+        df['discontinued'] = df['discontinued'].fillna(False).astype(bool)
+        for array_field in ['perfumer', 'top_notes', 'middle_notes', 'base_notes', 'main_accords']:
+            df[array_field] = df[array_field].apply(lambda x: x if isinstance(x, list) else [])
+        
+        # Filter out any records with missing required fields before insertion
+        valid = df['name'].notna() & (df['name'] != '') & df['url'].notna() & (df['url'] != '')
+        for name, url in df.loc[~valid, ['name', 'url']].itertuples(index=False):
+            print(f"Skipping record with missing required fields: name={name}, url={url}")
+        df = df[valid]
+        
+        # Upsert on URL; execute_values renders each page of rows into one multi-row VALUES statement
+        columns = list(df.columns)
+        upsert_sql = (
+            f"INSERT INTO fragrances ({', '.join(columns)}) VALUES %s "
+            f"ON CONFLICT (url) DO UPDATE SET {upsert_set_clause(columns)}"
+        )
+        # Retry for a batch that clashes on another unique key (name+brand): skip the conflicting rows,
+        # returning one row per insert so the skipped ones aren't counted
+        fallback_sql = f"INSERT INTO fragrances ({', '.join(columns)}) VALUES %s ON CONFLICT DO NOTHING RETURNING 1"
         
         # Process in batches
-        batch_size = 100
+        batch_size = 1000
         total_inserted = 0
         
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i + batch_size]
-            
-            # Clean records to match database schema exactly
-            for record in batch:
-                # Ensure arrays are not None
-                for array_field in ['perfumer', 'top_notes', 'middle_notes', 'base_notes', 'main_accords']:
-                    if record[array_field] is None:
-                        record[array_field] = []
-                
-                # Convert numeric fields and handle NaN values
-                for field in ['average_rating', 'total_ratings', 'release_year', 'longevity_rating', 'sillage_rating']:
-                    if field in record:
-                        if pd.isna(record[field]) or record[field] is None:
-                            if field in ['longevity_rating', 'sillage_rating', 'release_year']:
-                                record[field] = None  # These can be NULL
-                            else:
-                                record[field] = 0  # These have defaults
-                        elif isinstance(record[field], (np.integer, np.floating)):
-                            record[field] = record[field].item()
-                
-                # Ensure boolean fields are proper booleans
-                record['discontinued'] = bool(record.get('discontinued', False))
-                
-                # Ensure string fields are not None where they shouldn't be
-                if record.get('name') is None:
-                    continue  # Skip records with no name
-                
-                # Clean brand_name
-                if record.get('brand_name') is None or pd.isna(record.get('brand_name')):
-                    record['brand_name'] = 'Unknown'
-                
-                # Clean gender
-                if record.get('gender') is None or pd.isna(record.get('gender')):
-                    record['gender'] = 'unisex'
-            
-            try:
-                # Filter out any records with missing required fields before insertion
-                valid_batch = []
-                for record in batch:
-                    if record.get('name') and record.get('url'):
-                        valid_batch.append(record)
-                    else:
-                        print(f"Skipping record with missing required fields: name={record.get('name')}, url={record.get('url')}")
-                
-                if not valid_batch:
-                    print(f"No valid records in batch {i//batch_size + 1}")
-                    continue
-                
-                # Use upsert with proper conflict resolution on URL
-                stmt = insert(Fragrance).values(valid_batch)
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=['url'],
-                    set_={
-                        'name': stmt.excluded.name,
-                        'brand_name': stmt.excluded.brand_name,
-                        'gender': stmt.excluded.gender,
-                        'release_year': stmt.excluded.release_year,
-                        'concentration': stmt.excluded.concentration,
-                        'perfumer': stmt.excluded.perfumer,
-                        'top_notes': stmt.excluded.top_notes,
-                        'middle_notes': stmt.excluded.middle_notes,
-                        'base_notes': stmt.excluded.base_notes,
-                        'main_accords': stmt.excluded.main_accords,
-                        'average_rating': stmt.excluded.average_rating,
-                        'total_ratings': stmt.excluded.total_ratings,
-                        'longevity_rating': stmt.excluded.longevity_rating,
-                        'sillage_rating': stmt.excluded.sillage_rating,
-                        'description': stmt.excluded.description,
-                        'image_url': stmt.excluded.image_url,
-                        'discontinued': stmt.excluded.discontinued,
-                        'updated_at': datetime.now()
-                    }
-                )
-                
-                session.execute(stmt)
-                session.commit()
-                total_inserted += len(valid_batch)
-                print(f"Inserted batch {i//batch_size + 1}, valid records: {len(valid_batch)}, total: {total_inserted}")
-                
-            except Exception as batch_error:
-                session.rollback()
-                print(f"Batch {i//batch_size + 1} error: {batch_error}")
-                
-                # Try to identify the problematic record
-                if len(batch) == 1:
-                    print(f"Problematic record: {batch[0]}")
-                else:
-                    print(f"Batch size: {len(batch)}, trying individual inserts...")
-                    # Try inserting records individually to identify the problem
-                    for j, record in enumerate(batch):
-                        try:
-                            if record.get('name') and record.get('url'):
-                                individual_stmt = insert(Fragrance).values([record])
-                                individual_stmt = individual_stmt.on_conflict_do_nothing()
-                                session.execute(individual_stmt)
-                                session.commit()
-                                total_inserted += 1
-                                print(f"  Individual record {j} inserted successfully")
-                        except Exception as individual_error:
-                            session.rollback()
-                            # Skip constraint violations during individual processing
-                            if "duplicate key value violates unique constraint" in str(individual_error):
-                                print(f"  Record {j} skipped - duplicate: {record.get('name', 'Unknown')} by {record.get('brand_name', 'Unknown')}")
-                            else:
-                                print(f"  Individual record {j} failed: {individual_error}")
-                                print(f"  Record data: {record}")
-                continue
+        # Single transaction for the whole load; each batch sits behind a SAVEPOINT so a
+        # constraint failure only redoes that batch instead of rolling everything back
+        with connection.cursor() as cursor:
+            for i in range(0, len(df), batch_size):
+                # Only this batch is turned into Python tuples, with None for NULL
+                batch = df.iloc[i:i + batch_size]
+                rows = list(batch.astype(object).where(batch.notna(), None).itertuples(index=False, name=None))
+                cursor.execute("SAVEPOINT fragrance_batch")
+                try:
+                    # Every row is either inserted or updated on its url
+                    execute_values(cursor, upsert_sql, rows, page_size=500)
+                    batch_loaded = len(rows)
+                except psycopg2.IntegrityError as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT fragrance_batch")
+                    print(f"Batch {i//batch_size + 1} failed ({e.diag.constraint_name}), retrying with ON CONFLICT DO NOTHING")
+                    batch_loaded = len(execute_values(cursor, fallback_sql, rows, page_size=500, fetch=True))
+                cursor.execute("RELEASE SAVEPOINT fragrance_batch")
+                total_inserted += batch_loaded
+                print(f"Inserted batch {i//batch_size + 1}, valid records: {len(rows)}, loaded: {batch_loaded}, total: {total_inserted}")
         
+        connection.commit()
         print(f"Successfully loaded {total_inserted} records!")
         
     except Exception as e:
-        session.rollback()
+        connection.rollback()
+        print(f"Database error: {e}")
+        raise
+    finally:
+        connection.close()
+        engine.dispose()
+
+def format_pg_array(values):
+    """Render a list of strings as a Postgres array literal"""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"') for v in values)
+    return '{' + ','.join(f'"{v}"' for v in escaped) + '}'
+
+def format_pg_arrays(column):
+    """Render a column of string lists as Postgres array literals, using Arrow kernels when available"""
+    if pa is None:
+        return column.map(lambda xs: format_pg_array(xs) if isinstance(xs, list) else '{}')
+    
+    # Escape and quote every element in one flat pass, then join each list's slice of it
+    lists = pa.array(column.to_numpy(dtype=object), type=pa.list_(pa.string()), from_pandas=True)
+    items = pc.replace_substring(pc.replace_substring(lists.values, '\\', '\\\\'), '"', '\\"')
+    items = pc.binary_join_element_wise('"', items, '"', '')
+    joined = pc.binary_join(pa.ListArray.from_arrays(lists.offsets, items), ',')
+    literals = pc.binary_join_element_wise('{', joined, '}', '')
+    return pd.Series(literals.to_numpy(zero_copy_only=False), index=column.index)
+
+STAGING_TABLE_SQL = "CREATE TEMP TABLE fragrances_staging (LIKE fragrances INCLUDING DEFAULTS) ON COMMIT DROP"
+
+# Never overwritten on conflict: the key and identity columns, plus brand_id, which the
+# pipeline always writes as NULL but other code links afterwards
+UPSERT_PRESERVED_COLUMNS = ('id', 'url', 'brand_id', 'created_at', 'updated_at')
+
+def upsert_set_clause(columns):
+    """SET list for ON CONFLICT (url): overwrite the scraped columns, bump updated_at"""
+    update_columns = [col for col in columns if col not in UPSERT_PRESERVED_COLUMNS]
+    return ', '.join(f"{col} = EXCLUDED.{col}" for col in update_columns) + ", updated_at = now()"
+
+def merge_staging_sql(columns):
+    """Upsert staged rows on url; skip rows whose name+brand already belongs to a different url"""
+    column_list = ', '.join(columns)
+    return f"""
+        INSERT INTO fragrances ({column_list})
+        SELECT {column_list} FROM fragrances_staging s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM fragrances f
+            WHERE f.name = s.name AND f.brand_name = s.brand_name AND f.url <> s.url
+        )
+        ON CONFLICT (url) DO UPDATE SET {upsert_set_clause(columns)}
+    """
+
+def copy_to_database(df):
+    """Bulk load via COPY into a staging table, then upsert into fragrances in one statement"""
+    print("Loading to database with COPY...")
+    
+    columns = list(df.columns)
+    column_list = ', '.join(columns)
+    
+    # Shape the frame for COPY: nullable ints, array literals, NULL markers
+    for int_field in ['release_year', 'total_ratings']:
+        df[int_field] = df[int_field].astype('Int64')
+    for array_field in ['perfumer', 'top_notes', 'middle_notes', 'base_notes', 'main_accords']:
+        df[array_field] = format_pg_arrays(df[array_field])
+    
+    buffer = io.StringIO()
+    df.to_csv(buffer, header=False, index=False, na_rep='\\N')
+    buffer.seek(0)
+    
+    engine = create_engine(get_sync_db_url())
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(STAGING_TABLE_SQL)
+            cursor.copy_expert(
+                f"COPY fragrances_staging ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+            cursor.execute(merge_staging_sql(columns))
+            total_loaded = cursor.rowcount
+        connection.commit()
+        print(f"Successfully loaded {total_loaded} records!")
+    
+    except Exception as e:
+        connection.rollback()
         print(f"Database error: {e}")
         raise
     finally:
-        session.close()
+        connection.close()
+        engine.dispose()
+
+async def copy_to_database_async(df):
+    """Bulk load over asyncpg's binary COPY protocol, then upsert from the staging table"""
+    print("Loading to database with asyncpg COPY...")
+    
+    columns = list(df.columns)
+    
+    # asyncpg binds lists, ints and floats natively - only NA needs mapping to None
+    for int_field in ['release_year', 'total_ratings']:
+        df[int_field] = df[int_field].astype('Int64')
+    for array_field in ['perfumer', 'top_notes', 'middle_notes', 'base_notes', 'main_accords']:
+        df[array_field] = df[array_field].apply(lambda x: x if isinstance(x, list) else [])
+    records = list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+    
+    connection = await asyncpg.connect(get_sync_db_url())
+    try:
+        async with connection.transaction():
+            await connection.execute(STAGING_TABLE_SQL)
+            await connection.copy_records_to_table('fragrances_staging', records=records, columns=columns)
+            status = await connection.execute(merge_staging_sql(columns))
+        print(f"Successfully loaded {status.split()[-1]} records!")
+    
+    except Exception as e:
+        print(f"Database error: {e}")
+        raise
+    finally:
+        await connection.close()
 
 def main():
     """Run the ETL pipeline"""
+    parser = argparse.ArgumentParser(description="Load the fragrance dataset into Postgres")
+    parser.add_argument('--upsert', action='store_true', help="Use batched INSERT ... ON CONFLICT instead of COPY")
+    parser.add_argument('--async-copy', action='store_true', help="COPY through asyncpg's binary protocol")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Processes used for the transform step")
+    parser.add_argument('--chunksize', type=int, default=None, help="Stream the CSV in chunks of this many rows")
+    args = parser.parse_args()
+    
     try:
         print("Starting ETL Pipeline...")
         
-        # Extract
-        df = load_csv_data()
-        
-        # Transform
-        df_transformed = transform_data(df)
-        if df_transformed is None:
-            return
+        # Extract - one frame, or a stream of chunks so only one is resident at a time.
+        # Chunks are deduped individually; only their keys are kept to dedupe across chunks.
+        seen_urls, seen_name_brands = set(), set()
+        loaded_chunks = loaded_rows = 0
         
-        # Load
-        load_to_database(df_transformed)
+        # One pool for the whole run, so streamed chunks don't pay worker start-up each time
+        workers = args.workers or 1
+        with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+            for df in load_csv_data(args.chunksize):
+                
+                # Transform
+                df_transformed = transform_data_parallel(df, executor, workers)
+                del df  # release the raw columns before loading
+                if df_transformed is None:
+                    return
+                if args.chunksize:
+                    df_transformed = drop_seen_fragrances(df_transformed, seen_urls, seen_name_brands)
+                
+                # Load
+                if args.upsert:
+                    load_to_database(df_transformed)
+                elif args.async_copy:
+                    asyncio.run(copy_to_database_async(df_transformed))
+                else:
+                    copy_to_database(df_transformed)
+                loaded_chunks += 1
+                loaded_rows += len(df_transformed)
         
         print("Pipeline completed successfully!")
         
     except Exception as e:
         print(f"Pipeline failed: {e}")
+        # Each chunk commits on its own, so a failure mid-stream leaves a partial load behind
+        if args.chunksize and loaded_chunks:
+            print(f"WARNING: {loaded_chunks} chunks ({loaded_rows} rows) were already committed before the failure")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
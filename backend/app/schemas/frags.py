@@ -1,8 +1,27 @@
-from pydantic import BaseModel, Field, field_validator
+import re
+import sys
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, field_validator
 from uuid import UUID
-from typing import List, Optional, Dict, Any, Union
+from typing import Annotated, FrozenSet, List, Optional, Dict, Any, Union
 from enum import Enum
 
+from app.ml.models import Fragrance, NotePreference, RecommendationResult
+
+
+# Canonical hyphenated UUID - matched before falling back to the slower UUID() parse
+_UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
+
+
+def _is_uuid(value: str) -> bool:
+    if _UUID_RE.fullmatch(value):
+        return True
+    # Braced, urn: and unhyphenated forms are still valid UUIDs
+    try:
+        UUID(value)
+        return True
+    except ValueError:
+        return False
+
 
 # =====================================================
 # SIMILARITY RECOMMENDER MODELS (Find Similar to Target)
@@ -16,20 +35,18 @@ class SimilarityRequest(BaseModel):
     @classmethod
     def validate_fragrance_ids(cls, v):
         if isinstance(v, str):
-            try:
-                UUID(v)
-                return v
-            except ValueError:
+            if not _is_uuid(v):
                 raise ValueError('Invalid UUID format')
+            return v
         elif isinstance(v, list):
+            # Drop repeated IDs, keeping the first occurrence's position
+            v = list(dict.fromkeys(v))
             if len(v) > 10:
                 raise ValueError('Maximum 10 fragrances allowed')
             if len(v) == 0:
                 raise ValueError('At least one fragrance ID required')
             for frag_id in v:
-                try:
-                    UUID(frag_id)
-                except ValueError:
+                if not _is_uuid(frag_id):
                     raise ValueError(f'Invalid UUID format: {frag_id}')
             return v
         else:
@@ -37,14 +54,16 @@ class SimilarityRequest(BaseModel):
 
 
 class TargetFragranceInfo(BaseModel):
-    
+    model_config = ConfigDict(frozen=True)
+
     id: UUID = Field(..., description="Fragrance UUID")
     name: str = Field(..., description="Fragrance name")
     brand: str = Field(..., description="Brand name")
 
 
 class SimilarityResponse(BaseModel):
-    
+    model_config = ConfigDict(frozen=True)
+
     request_id: str = Field(..., description="Unique request identifier")
     target_fragrances: List[TargetFragranceInfo] = Field(..., description="Details of the target fragrance(s)")
     analysis_type: str = Field(..., description="Type of analysis: 'single' or 'collection'")
@@ -58,17 +77,11 @@ class SimilarityResponse(BaseModel):
 
 class NotePreferenceInput(BaseModel):
     
-    name: str = Field(..., min_length=1, max_length=100, description="Name of the note or accord")
+    # Cleaned and normalized in pydantic-core - stripped, lowercased, then length checked
+    name: Annotated[
+        str, StringConstraints(strip_whitespace=True, to_lower=True, min_length=1, max_length=100)
+    ] = Field(..., description="Name of the note or accord")
     importance: int = Field(..., ge=1, le=10, description="How much user likes this (1=hate, 10=love)")
-    
-    @field_validator('name')
-    @classmethod
-    def validate_name(cls, v):
-        # Clean and normalize the note name
-        cleaned = v.strip().lower()
-        if not cleaned:
-            raise ValueError("Note name cannot be empty")
-        return cleaned
 
 
 class NoteBasedRequest(BaseModel):
@@ -105,7 +118,8 @@ class NoteBasedRequest(BaseModel):
 
 
 class UserPreferenceProfile(BaseModel):
-   
+    model_config = ConfigDict(frozen=True)
+
     loved_notes: List[str] = Field(default_factory=list, description="Notes rated 8-10")
     liked_notes: List[str] = Field(default_factory=list, description="Notes rated 6-7") 
     disliked_notes: List[str] = Field(default_factory=list, description="Notes rated 1-3")
@@ -113,10 +127,15 @@ class UserPreferenceProfile(BaseModel):
     liked_accords: List[str] = Field(default_factory=list, description="Accords rated 6-7")
     disliked_accords: List[str] = Field(default_factory=list, description="Accords rated 1-3")
     total_preferences: int = Field(..., description="Total number of preferences provided")
+    # Loved + liked names (importance >= 6), built once per request for the per-item
+    # shared note/accord probes; internal only, never serialized
+    high_importance_notes_lc: FrozenSet[str] = Field(default_factory=frozenset, exclude=True)
+    high_importance_accords_lc: FrozenSet[str] = Field(default_factory=frozenset, exclude=True)
 
 
 class NoteBasedResponse(BaseModel):
-  
+    model_config = ConfigDict(frozen=True)
+
     request_id: str = Field(..., description="Unique request identifier")
     user_profile: UserPreferenceProfile = Field(..., description="Summary of user preferences")
     recommendations: List['RecommendationItem'] = Field(..., description="Personalized recommendations")
@@ -128,7 +147,8 @@ class NoteBasedResponse(BaseModel):
 # =====================================================
 
 class FragranceDetail(BaseModel):
-  
+    model_config = ConfigDict(frozen=True)
+
     id: UUID = Field(..., description="Fragrance UUID")
     name: str = Field(..., description="Fragrance name")
     brand: str = Field(..., description="Brand name")
@@ -141,7 +161,8 @@ class FragranceDetail(BaseModel):
 
 
 class RecommendationExplanation(BaseModel):
-    
+    model_config = ConfigDict(frozen=True)
+
     primary_reason: str = Field(..., description="Main reason for recommendation")
     shared_notes: List[str] = Field(default_factory=list, description="Notes in common with preferences")
     shared_accords: List[str] = Field(default_factory=list, description="Accords in common with preferences")
@@ -150,13 +171,23 @@ class RecommendationExplanation(BaseModel):
 
 
 class RecommendationItem(BaseModel):
-   
+    model_config = ConfigDict(frozen=True)
+
     fragrance: FragranceDetail = Field(..., description="Fragrance details")
     score: float = Field(..., ge=0.0, le=1.0, description="Recommendation score")
     explanation: RecommendationExplanation = Field(..., description="Why this was recommended")
     rank: int = Field(..., ge=1, description="Rank in recommendation list")
 
+
+# The response models above forward-reference RecommendationItem, which leaves their schemas
+# unbuilt until first use - resolve them at import instead of on the first request
+SimilarityResponse.model_rebuild()
+NoteBasedResponse.model_rebuild()
+
+
 class FragranceSearchResult(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: str  
     name: str
     brand: str
@@ -186,14 +217,7 @@ class ErrorResponse(BaseModel):
 # UTILITY FUNCTIONS FOR CONVERTING BETWEEN MODELS
 # =====================================================
 
-def convert_note_preferences(pydantic_prefs: List[NotePreferenceInput]) -> List['NotePreference']:
-    
-    from dataclasses import dataclass
-    
-    @dataclass
-    class NotePreference:
-        name: str
-        importance: int
+def convert_note_preferences(pydantic_prefs: List[NotePreferenceInput]) -> List[NotePreference]:
     
     return [NotePreference(name=pref.name, importance=pref.importance) for pref in pydantic_prefs]
 
@@ -203,9 +227,15 @@ def create_user_profile(note_prefs: List[NotePreferenceInput],
     
     
     def categorize_preferences(prefs: List[NotePreferenceInput]) -> tuple:
-        loved = [p.name for p in prefs if p.importance >= 8]
-        liked = [p.name for p in prefs if 6 <= p.importance <= 7]
-        disliked = [p.name for p in prefs if p.importance <= 3]
+        # One pass over the preferences, bucketing each by importance
+        loved, liked, disliked = [], [], []
+        for p in prefs:
+            if p.importance >= 8:
+                loved.append(p.name)
+            elif p.importance >= 6:
+                liked.append(p.name)
+            elif p.importance <= 3:
+                disliked.append(p.name)
         return loved, liked, disliked
     
     loved_notes, liked_notes, disliked_notes = categorize_preferences(note_prefs)
@@ -218,97 +248,92 @@ def create_user_profile(note_prefs: List[NotePreferenceInput],
         loved_accords=loved_accords,
         liked_accords=liked_accords,
         disliked_accords=disliked_accords,
-        total_preferences=len(note_prefs) + len(accord_prefs)
+        total_preferences=len(note_prefs) + len(accord_prefs),
+        # NotePreferenceInput has already lowercased the names; interned to match the
+        # recommenders' note vocabulary so set probes hit on identity
+        high_importance_notes_lc=frozenset(map(sys.intern, loved_notes + liked_notes)),
+        high_importance_accords_lc=frozenset(map(sys.intern, loved_accords + liked_accords))
+    )
+
+
+# The converters below wrap recommender output, which is already well-formed (ids from the
+# database, scores in [0, 1], ratings from the pipeline), so they build the response models
+# with model_construct and skip per-field validation.
+
+def _fragrance_detail(fragrance: 'Fragrance') -> FragranceDetail:
+    
+    # Recommenders keep ids as strings; model_construct won't coerce them
+    fragrance_id = fragrance.id if isinstance(fragrance.id, UUID) else UUID(fragrance.id)
+    return FragranceDetail.model_construct(
+        id=fragrance_id,
+        name=fragrance.name,
+        brand=fragrance.brand,
+        top_notes=fragrance.top_notes,
+        middle_notes=fragrance.middle_notes,
+        base_notes=fragrance.base_notes,
+        accords=fragrance.accords,
+        avg_rating=fragrance.avg_rating,
+        num_ratings=fragrance.num_ratings
     )
 
 
 def convert_recommendation_to_api(rec: 'RecommendationResult', rank: int, 
-                                user_note_prefs: List[NotePreferenceInput],
-                                user_accord_prefs: List[NotePreferenceInput]) -> RecommendationItem:
+                                profile: UserPreferenceProfile) -> RecommendationItem:
    
     
-    # Find shared elements
-    user_notes = {p.name.lower() for p in user_note_prefs if p.importance >= 6}
-    user_accords = {p.name.lower() for p in user_accord_prefs if p.importance >= 6}
-    
-    fragrance_notes = {note.lower() for note in rec.fragrance.notes}
-    fragrance_accords = {accord.lower() for accord in rec.fragrance.accords}
-    
-    shared_notes = list(user_notes & fragrance_notes)
-    shared_accords = list(user_accords & fragrance_accords)
+    # Find shared elements - probe the user's sets with each fragrance note, in the fragrance's order.
+    # Recommender notes/accords are lowercased and interned at load (_clean_note_list)
+    user_notes_lc = profile.high_importance_notes_lc
+    user_accords_lc = profile.high_importance_accords_lc
+    # Skip the scan entirely when the user has no loved/liked names on that side
+    shared_notes = list(dict.fromkeys(n for n in rec.fragrance.notes if n in user_notes_lc)) if user_notes_lc else []
+    shared_accords = list(dict.fromkeys(a for a in rec.fragrance.accords if a in user_accords_lc)) if user_accords_lc else []
     
     # Create explanation
     if shared_accords:
-        primary_reason = f"Matches your preferred style: {', '.join(shared_accords[:2])}"
+        primary_reason = "Matches your preferred style: " + ", ".join(shared_accords[:2])
     elif shared_notes:
-        primary_reason = f"Contains notes you love: {', '.join(shared_notes[:3])}"
+        primary_reason = "Contains notes you love: " + ", ".join(shared_notes[:3])
     else:
         primary_reason = "Recommended based on your overall preferences"
     
-    quality_note = None
-    if rec.fragrance.avg_rating >= 4.0 and rec.fragrance.num_ratings >= 100:
-        quality_note = f"Highly rated ({rec.fragrance.avg_rating:.1f}/5 from {rec.fragrance.num_ratings:,} reviews)"
-    
-    return RecommendationItem(
-        fragrance=FragranceDetail(
-            id=rec.fragrance.id,
-            name=rec.fragrance.name,
-            brand=rec.fragrance.brand,
-            top_notes=rec.fragrance.top_notes,
-            middle_notes=rec.fragrance.middle_notes,
-            base_notes=rec.fragrance.base_notes,
-            accords=rec.fragrance.accords,
-            avg_rating=rec.fragrance.avg_rating,
-            num_ratings=rec.fragrance.num_ratings
-        ),
+    return RecommendationItem.model_construct(
+        fragrance=_fragrance_detail(rec.fragrance),
         score=rec.score,
-        explanation=RecommendationExplanation(
+        explanation=RecommendationExplanation.model_construct(
             primary_reason=primary_reason,
             shared_notes=shared_notes,
             shared_accords=shared_accords,
-            quality_note=quality_note,
+            quality_note=rec.fragrance.quality_note,
             similarity_score=rec.score
         ),
         rank=rank
     )
 
 
-def convert_similarity_recommendation_to_api(rec: 'RecommendationResult', rank: int, 
-                                           target_fragrances: List['TargetFragranceInfo']) -> RecommendationItem:
-   
+def similarity_reason(target_fragrances: List['TargetFragranceInfo']) -> str:
     
-    # Create explanation based on whether it's single or multiple targets
+    # Depends only on the targets, so the endpoint builds it once for every recommendation
     if len(target_fragrances) == 1:
-        primary_reason = f"Similar to {target_fragrances[0].name}"
-    else:
-        target_names = [frag.name for frag in target_fragrances[:2]]  # Show first 2 names
-        if len(target_fragrances) > 2:
-            primary_reason = f"Similar to {', '.join(target_names)} and {len(target_fragrances) - 2} others"
-        else:
-            primary_reason = f"Similar to {' and '.join(target_names)}"
-    
-    quality_note = None
-    if rec.fragrance.avg_rating >= 4.0 and rec.fragrance.num_ratings >= 100:
-        quality_note = f"Highly rated ({rec.fragrance.avg_rating:.1f}/5 from {rec.fragrance.num_ratings:,} reviews)"
+        return f"Similar to {target_fragrances[0].name}"
+    target_names = [frag.name for frag in target_fragrances[:2]]  # Show first 2 names
+    if len(target_fragrances) > 2:
+        return f"Similar to {', '.join(target_names)} and {len(target_fragrances) - 2} others"
+    return f"Similar to {' and '.join(target_names)}"
+
+
+def convert_similarity_recommendation_to_api(rec: 'RecommendationResult', rank: int, 
+                                           primary_reason: str) -> RecommendationItem:
+   
     
-    return RecommendationItem(
-        fragrance=FragranceDetail(
-            id=rec.fragrance.id,
-            name=rec.fragrance.name,
-            brand=rec.fragrance.brand,
-            top_notes=rec.fragrance.top_notes,
-            middle_notes=rec.fragrance.middle_notes,
-            base_notes=rec.fragrance.base_notes,
-            accords=rec.fragrance.accords,
-            avg_rating=rec.fragrance.avg_rating,
-            num_ratings=rec.fragrance.num_ratings
-        ),
+    return RecommendationItem.model_construct(
+        fragrance=_fragrance_detail(rec.fragrance),
         score=rec.score,
-        explanation=RecommendationExplanation(
+        explanation=RecommendationExplanation.model_construct(
             primary_reason=primary_reason,
             shared_notes=[], 
             shared_accords=[], 
-            quality_note=quality_note,
+            quality_note=rec.fragrance.quality_note,
             similarity_score=rec.score
         ),
         rank=rank
@@ -3,7 +3,7 @@ Profile API Schemas
 Pydantic models for profile endpoints
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -14,6 +14,8 @@ from datetime import datetime
 
 class QuickStats(BaseModel):
     """User's quick statistics for dashboard cards"""
+    model_config = ConfigDict(frozen=True)
+
     fragrances_owned: int = Field(..., description="Number of fragrances in collection")
     avg_match_score: float = Field(..., ge=0, le=100, description="Average recommendation match score")
     notes_explored: int = Field(..., description="Number of unique notes user has explored")
@@ -26,14 +28,16 @@ class NoteBreakdownItem(BaseModel):
     value: float = Field(..., ge=0, le=100, description="Percentage of this note in user's profile")
     color: str = Field(..., description="Hex color for chart display")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "name": "Vanilla",
                 "value": 35.0,
                 "color": "#ff9ab3"
             }
         }
+    )
 
 
 class AccordProfileItem(BaseModel):
@@ -42,14 +46,16 @@ class AccordProfileItem(BaseModel):
     value: float = Field(..., ge=0, le=100, description="Percentage of this accord in profile")
     color: str = Field(..., description="Hex color for chart display")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "name": "Woody",
                 "value": 45.0,
                 "color": "#ff9ab3"
             }
         }
+    )
 
 
 class RadarDataItem(BaseModel):
@@ -57,13 +63,15 @@ class RadarDataItem(BaseModel):
     category: str = Field(..., description="Fragrance family category")
     value: float = Field(..., ge=0, le=100, description="Score for this category (0-100)")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "category": "Woody",
                 "value": 90.0
             }
         }
+    )
 
 
 class FragranceItem(BaseModel):
@@ -78,8 +86,9 @@ class FragranceItem(BaseModel):
     base_notes: List[str] = Field(default_factory=list, description="Base notes")
     accords: List[str] = Field(default_factory=list, description="Main accords/families")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "id": "123e4567-e89b-12d3-a456-426614174000",
                 "name": "Oud Wood",
@@ -92,6 +101,7 @@ class FragranceItem(BaseModel):
                 "accords": ["woody", "warm spicy", "earthy"]
             }
         }
+    )
 
 
 class RecentActivityItem(BaseModel):
@@ -100,14 +110,16 @@ class RecentActivityItem(BaseModel):
     time: str = Field(..., description="Human-readable time (e.g., '2 hours ago')")
     timestamp: datetime = Field(..., description="Actual timestamp for sorting")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "action": "Added Oud Wood to collection",
                 "time": "2 hours ago",
                 "timestamp": "2024-03-15T14:30:00Z"
             }
         }
+    )
 
 
 class UserInfo(BaseModel):
@@ -118,8 +130,9 @@ class UserInfo(BaseModel):
     avatar: str = Field(..., description="User's initials for avatar display")
     quiz_completed: bool = Field(..., description="Whether user completed onboarding quiz")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "name": "Sarah Mitchell",
                 "email": "sarah@example.com",
@@ -128,6 +141,7 @@ class UserInfo(BaseModel):
                 "quiz_completed": True
             }
         }
+    )
 
 
 
@@ -147,8 +161,9 @@ class ProfileResponse(BaseModel):
     insights: List[str] = Field(..., description="Personalized insights and recommendations")
     recent_activity: List[RecentActivityItem] = Field(..., description="Recent user actions timeline")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "user": {
                     "name": "Sarah Mitchell",
@@ -201,6 +216,7 @@ class ProfileResponse(BaseModel):
                 ]
             }
         }
+    )
 
 
 
@@ -209,6 +225,8 @@ class ProfileResponse(BaseModel):
 
 class NetworkNode(BaseModel):
     """Node in the fragrance network graph"""
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="Node ID")
     label: str = Field(..., description="Display label")
     type: str = Field(..., description="Node type: 'fragrance', 'note', 'accord'")
@@ -219,6 +237,8 @@ class NetworkNode(BaseModel):
 
 class NetworkEdge(BaseModel):
     """Edge/connection in the fragrance network graph"""
+    model_config = ConfigDict(frozen=True)
+
     source: str = Field(..., description="Source node ID")
     target: str = Field(..., description="Target node ID")
     weight: float = Field(..., ge=0, le=1, description="Connection strength (0-1)")
@@ -226,6 +246,8 @@ class NetworkEdge(BaseModel):
 
 class NetworkCommunity(BaseModel):
     """Detected community/cluster in network"""
+    model_config = ConfigDict(frozen=True)
+
     id: int = Field(..., description="Community ID")
     label: str = Field(..., description="Community label/description")
     size: int = Field(..., description="Number of nodes in community")
@@ -237,6 +259,8 @@ class NetworkGraphResponse(BaseModel):
     Network graph data response
     This will be returned by GET /api/v1/profile/{user_id}/network
     """
+    model_config = ConfigDict(frozen=True)
+
     nodes: List[NetworkNode] = Field(..., description="Graph nodes")
     edges: List[NetworkEdge] = Field(..., description="Graph edges/connections")
     communities: List[NetworkCommunity] = Field(..., description="Detected communities")
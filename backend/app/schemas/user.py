@@ -1,5 +1,5 @@
 # backend/app/schemas/user.py
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 from uuid import UUID
 from datetime import datetime
 from typing import Optional
@@ -29,11 +29,24 @@ class UserCreate(UserBase):
         
         if len(v) < 8:
             raise ValueError('Password must be at least 8 characters')
-        if not any(c.isupper() for c in v):
+        # One scan for all three character classes, stopping once each has been seen
+        has_upper = has_lower = has_digit = False
+        for c in v:
+            if c.isupper():
+                has_upper = True
+            elif c.islower():
+                has_lower = True
+            elif c.isdigit():
+                has_digit = True
+            else:
+                continue
+            if has_upper and has_lower and has_digit:
+                break
+        if not has_upper:
             raise ValueError('Password must contain at least one uppercase letter')
-        if not any(c.islower() for c in v):
+        if not has_lower:
             raise ValueError('Password must contain at least one lowercase letter')
-        if not any(c.isdigit() for c in v):
+        if not has_digit:
             raise ValueError('Password must contain at least one digit')
         return v
     
@@ -64,12 +77,8 @@ class UserRead(UserBase):
     last_login: Optional[datetime] = Field(None, description="Last login timestamp")
     full_name: Optional[str] = Field(None, description="User's full name")
     
-    class Config:
-        from_attributes = True  # Updated for Pydantic V2
-        json_encoders = {
-            datetime: lambda dt: dt.isoformat(),
-            UUID: lambda uuid: str(uuid)
-        }
+    # datetime and UUID are serialized natively by pydantic-core - no per-value Python callbacks
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserProfile(UserRead):
@@ -1,6 +1,7 @@
 ﻿-- Initialize database with extensions
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+CREATE EXTENSION IF NOT EXISTS "pgcrypto";
 
 -- Create initial tables will be handled by Alembic migrations
 -- This file is for database-level setup only
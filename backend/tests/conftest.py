@@ -0,0 +1,8 @@
+"""
+tests/conftest.py
+Placeholder settings so app modules import without a configured .env
+"""
+import os
+
+for _var in ('DATABASE_PASSWORD', 'DATABASE_NAME', 'DATABASE_USERNAME', 'SECRET_KEY'):
+    os.environ.setdefault(_var, 'test')
@@ -0,0 +1,389 @@
+"""
+tests/test_pipeline.py
+Pipeline checks that run without a database
+"""
+import csv
+import gc
+import io
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from app.pipeline import pipeline
+from app.pipeline.pipeline import (
+    csv_decodes, drop_seen_fragrances, load_csv_data,
+    format_pg_array, format_pg_arrays, read_csv_chunks, transform_data, transform_data_parallel, upsert_set_clause,
+)
+
+
+HEADER = ';'.join(pipeline.SOURCE_COLUMNS)
+
+ROWS = [
+    # url; Perfume; Brand; Gender; Rating Value; Rating Count; Year; Top; Middle; Base;
+    # Perfumer1; Perfumer2; mainaccord1..5
+    'https://f.com/1;aventus;creed;men;4,33;900;2010;pineapple, bergamot;birch;musk;olivier creed;unknown;fruity;woody;;;',
+    'https://f.com/2;terre;hermès;for men;4,10;1200;2006;orange;pepper;vetiver;jean-claude ellena;unknown;citrus;woody;;;',
+    'https://f.com/3;aventus;creed;men;4,50;50;2011;apple;rose;amber;unknown;unknown;fruity;;;;',
+    'https://f.com/1;aventus dup url;creed;men;3,00;10;2010;lemon;;;unknown;unknown;citrus;;;;',
+    'https://f.com/4;libre;ysl;women;4,00;300;2019;lavender;orange blossom;vanilla;anne flipo;carlos benaim;floral;;;;',
+    'https://f.com/5;oud wood;tom ford;unisex;4,20;700;1750;rosewood;oud;tonka;richard herpin;unknown;woody;oud;;;',
+    'https://f.com/6;baccarat rouge;mfk;women;4,40;800;2015;saffron;jasmine;ambergris;francis kurkdjian;unknown;amber;;;;',
+    'https://f.com/4;libre again;ysl;women;4,90;5;2020;;;;unknown;unknown;;;;;',
+]
+
+# The same rows with a space after every ';' - blank fields become a lone space
+PADDED_ROWS = [row.replace(';', '; ') for row in ROWS]
+
+
+def write_csv(path, encoding='utf-8', rows=ROWS):
+    path.write_text('\n'.join([HEADER] + rows) + '\n', encoding=encoding)
+    return path
+
+
+def use_reader(monkeypatch, reader):
+    """Route read_csv_chunks to one reader by hiding the faster ones"""
+    if reader != 'duckdb':
+        monkeypatch.setattr(pipeline, 'duckdb', None)
+    if reader == 'pandas':
+        monkeypatch.setattr(pipeline, 'pa_csv', None)
+    if reader == 'duckdb' and pipeline.duckdb is None:
+        pytest.skip('duckdb not installed')
+    if reader == 'arrow' and pipeline.pa_csv is None:
+        pytest.skip('pyarrow not installed')
+
+
+def raw_frame():
+    """The sample rows as the readers hand them over: every cell a string"""
+    return pd.DataFrame([row.split(';') for row in ROWS], columns=pipeline.SOURCE_COLUMNS).replace('', None)
+
+
+class TestParallelTransform:
+    """Process-pool transform against the serial one"""
+
+    def test_parallel_matches_serial(self):
+        df = raw_frame()
+        serial = transform_data(df)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            parallel = transform_data_parallel(df, executor, max_workers=2)
+
+        # Each worker factorizes gender over its own rows, so the stitched categories differ;
+        # compare the labels themselves
+        def normalize(df):
+            return df.astype({'gender': str}).sort_values('url').reset_index(drop=True)
+
+        pd.testing.assert_frame_equal(normalize(parallel), normalize(serial))
+
+    def test_duplicates_split_across_workers(self):
+        # The two f.com/4 rows land in different worker chunks; the stitched frame still dedupes them
+        df = raw_frame()
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            parallel = transform_data_parallel(df, executor, max_workers=2)
+
+        assert parallel['url'].is_unique
+        assert parallel.set_index('url').loc['https://f.com/4', 'name'] == 'libre'
+
+    def test_single_worker_falls_back_to_serial(self):
+        df = raw_frame()
+        pd.testing.assert_frame_equal(transform_data_parallel(df), transform_data(df))
+
+
+class TestPaddedFields:
+    """'; '-separated input reads the same as ';'-separated, as with pandas' skipinitialspace"""
+
+    READERS = ['duckdb', 'arrow', 'pandas']
+
+    def read(self, tmp_path, rows, chunksize=None):
+        csv_file = write_csv(tmp_path / f'fra_{len(rows[0])}.csv', rows=rows)
+        return pd.concat(read_csv_chunks(csv_file, 'utf-8', chunksize), ignore_index=True)
+
+    @pytest.mark.parametrize('reader', READERS)
+    @pytest.mark.parametrize('chunksize', [None, 3])
+    def test_leading_spaces_stripped(self, tmp_path, monkeypatch, reader, chunksize):
+        use_reader(monkeypatch, reader)
+        df = self.read(tmp_path, PADDED_ROWS, chunksize)
+
+        assert df.loc[1, 'Brand'] == 'hermès'
+        assert df.loc[1, 'Perfume'] == 'terre'
+        assert df.loc[0, 'Gender'] == 'men'
+        # A field holding only the padding is missing, like an empty one
+        assert pd.isna(df.loc[3, 'Middle'])
+        assert pd.isna(df.loc[0, 'mainaccord3'])
+
+    @pytest.mark.parametrize('reader', READERS)
+    @pytest.mark.parametrize('chunksize', [None, 3])
+    def test_transform_unchanged_by_padding(self, tmp_path, monkeypatch, reader, chunksize):
+        use_reader(monkeypatch, reader)
+        plain = transform_data(self.read(tmp_path, ROWS, chunksize))
+        padded = transform_data(self.read(tmp_path, PADDED_ROWS, chunksize))
+
+        pd.testing.assert_frame_equal(padded, plain)
+        assert set(padded['gender']) == {'male', 'female', 'unisex'}
+
+
+class TestCopyFormatting:
+    """Postgres array literals written into the COPY buffer"""
+
+    VALUES = [
+        ['rose', 'oud'],
+        ['say "hi"', 'back\\slash', 'a, b', '{braces}'],
+        [],
+        None,
+    ]
+    EXPECTED = [
+        '{"rose","oud"}',
+        '{"say \\"hi\\"","back\\\\slash","a, b","{braces}"}',
+        '{}',
+        '{}',
+    ]
+
+    def test_format_pg_array(self):
+        for values, expected in zip(self.VALUES[:3], self.EXPECTED[:3]):
+            assert format_pg_array(values) == expected
+
+    @pytest.mark.parametrize('use_arrow', [True, False])
+    def test_format_pg_arrays(self, monkeypatch, use_arrow):
+        if use_arrow and pipeline.pa is None:
+            pytest.skip('pyarrow not installed')
+        if not use_arrow:
+            monkeypatch.setattr(pipeline, 'pa', None)
+        column = pd.Series(self.VALUES, index=[10, 11, 12, 13])
+
+        result = format_pg_arrays(column)
+
+        assert result.tolist() == self.EXPECTED
+        assert result.index.tolist() == [10, 11, 12, 13]
+
+    def test_format_pg_arrays_matches_per_row(self):
+        column = transform_data(raw_frame())['top_notes']
+        expected = [format_pg_array(notes) for notes in column]
+        assert format_pg_arrays(column).tolist() == expected
+
+    def test_copy_buffer_round_trips(self):
+        # The CSV layer quotes the literal; Postgres' array parser gets it back verbatim
+        df = pd.DataFrame({'notes': [format_pg_array(self.VALUES[1])], 'year': [None]})
+        buffer = io.StringIO()
+        df.to_csv(buffer, header=False, index=False, na_rep='\\N')
+
+        row = next(csv.reader(io.StringIO(buffer.getvalue())))
+        assert row == [self.EXPECTED[1], '\\N']
+
+
+class TestDedupe:
+    """Duplicate urls and name+brand pairs collapse onto the most-rated row"""
+
+    def test_keeps_most_rated_row(self):
+        result = transform_data(raw_frame()).set_index('url')
+
+        assert result.index.is_unique
+        assert not result[['name', 'brand_name']].duplicated().any()
+        # f.com/3 loses to f.com/1 on name+brand, 'aventus dup url' loses on url
+        assert set(result.index) == {f'https://f.com/{i}' for i in (1, 2, 4, 5, 6)}
+        assert result.loc['https://f.com/1', 'name'] == 'aventus'
+        assert result.loc['https://f.com/4', 'name'] == 'libre'
+
+    def test_keeps_file_order(self):
+        result = transform_data(raw_frame())
+        assert list(result.index) == sorted(result.index)
+
+
+class TestDuckdbReader:
+    """The default utf-8 path: DuckDB reads every column as text and reports what it skips"""
+
+    @pytest.fixture(autouse=True)
+    def duckdb_calls(self, monkeypatch):
+        if pipeline.duckdb is None:
+            pytest.skip('duckdb not installed')
+        calls = []
+        read_csv_duckdb = pipeline.read_csv_duckdb
+
+        def spy(*args, **kwargs):
+            calls.append(args)
+            return read_csv_duckdb(*args, **kwargs)
+
+        monkeypatch.setattr(pipeline, 'read_csv_duckdb', spy)
+        return calls
+
+    def test_reads_utf8_as_text(self, tmp_path, duckdb_calls):
+        csv_file = write_csv(tmp_path / 'fra_cleaned.csv')
+        frames = list(read_csv_chunks(csv_file, 'utf-8'))
+
+        assert duckdb_calls
+        assert len(frames) == 1
+        df = frames[0]
+        assert list(df.columns) == pipeline.SOURCE_COLUMNS
+        assert len(df) == len(ROWS)
+        assert df.loc[1, 'Brand'] == 'hermès'
+        # Nothing is type-inferred: years and counts stay strings
+        assert df.loc[0, 'Year'] == '2010'
+        assert pd.isna(df.loc[0, 'mainaccord3'])
+
+    def test_matches_arrow_reader(self, tmp_path, monkeypatch):
+        csv_file = write_csv(tmp_path / 'fra_cleaned.csv')
+        from_duckdb = transform_data(next(read_csv_chunks(csv_file, 'utf-8')))
+        monkeypatch.setattr(pipeline, 'duckdb', None)
+        from_arrow = transform_data(next(read_csv_chunks(csv_file, 'utf-8')))
+
+        pd.testing.assert_frame_equal(from_duckdb, from_arrow, check_dtype=False)
+
+    def test_malformed_lines_reported(self, tmp_path, capsys):
+        rows = ROWS[:2] + [ROWS[2] + ';extra'] + ROWS[3:]
+        csv_file = write_csv(tmp_path / 'fra_cleaned.csv', rows=rows)
+        df = next(read_csv_chunks(csv_file, 'utf-8'))
+
+        assert len(df) == len(ROWS) - 1
+        assert 'https://f.com/3' not in set(df['url'])
+        assert 'Skipped 1 malformed lines' in capsys.readouterr().out
+
+    def test_latin1_input_is_an_error(self, tmp_path):
+        csv_file = write_csv(tmp_path / 'fra_cleaned.csv', encoding='latin1')
+        with pytest.raises(UnicodeError):
+            list(read_csv_chunks(csv_file, 'utf-8'))
+
+
+class TestUpsertSetClause:
+    """ON CONFLICT (url) never rewrites the key, identity or linked columns"""
+
+    def test_preserved_columns_excluded(self):
+        columns = ['id', 'name', 'brand_name', 'brand_id', 'average_rating', 'url', 'created_at']
+
+        assert upsert_set_clause(columns) == (
+            "name = EXCLUDED.name, brand_name = EXCLUDED.brand_name, "
+            "average_rating = EXCLUDED.average_rating, updated_at = now()"
+        )
+
+    def test_pipeline_columns(self):
+        clause = upsert_set_clause(list(transform_data(raw_frame()).columns))
+
+        assert clause.endswith(', updated_at = now()')
+        assert clause.count('updated_at') == 1
+        assert 'brand_id' not in clause
+        assert 'url = EXCLUDED.url' not in clause
+        assert 'image_url = EXCLUDED.image_url' in clause
+
+
+class TestChunkedRead:
+    """--chunksize streams frames of exactly that many rows from every reader"""
+
+    @pytest.mark.parametrize('reader', ['duckdb', 'arrow', 'pandas'])
+    @pytest.mark.parametrize('chunksize', [1, 3, 8, 50])
+    def test_chunk_sizes(self, tmp_path, monkeypatch, reader, chunksize):
+        use_reader(monkeypatch, reader)
+        csv_file = write_csv(tmp_path / 'fra_cleaned.csv')
+
+        chunks = list(read_csv_chunks(csv_file, 'utf-8', chunksize))
+
+        assert [len(chunk) for chunk in chunks[:-1]] == [chunksize] * (len(chunks) - 1)
+        assert 0 < len(chunks[-1]) <= chunksize
+        # Streamed reads keep every column as text, so compare what the transform makes of them
+        whole = transform_data(next(read_csv_chunks(csv_file, 'utf-8')))
+        streamed = transform_data(pd.concat(chunks, ignore_index=True))
+        pd.testing.assert_frame_equal(streamed, whole, check_dtype=False)
+
+    def test_duckdb_chunks_past_one_vector(self, tmp_path, monkeypatch):
+        use_reader(monkeypatch, 'duckdb')
+        rows = [row.replace('https://f.com/', f'https://f.com/{n}-') for n in range(400) for row in ROWS[:6]]
+        csv_file = write_csv(tmp_path / 'fra_cleaned.csv', rows=rows)
+
+        chunks = list(read_csv_chunks(csv_file, 'utf-8', 1000))
+
+        assert [len(chunk) for chunk in chunks] == [1000, 1000, 400]
+        assert pd.concat(chunks)['url'].tolist() == [row.split(';')[0] for row in rows]
+
+
+class TestChunkedDedupe:
+    """Keys stay unique across chunks once drop_seen_fragrances is threaded through"""
+
+    @pytest.mark.parametrize('chunk_size', [1, 2, 3, 5])
+    def test_keys_unique_across_chunks(self, chunk_size):
+        df = raw_frame()
+        seen_urls, seen_name_brands = set(), set()
+        loaded = []
+        for start in range(0, len(df), chunk_size):
+            chunk = transform_data(df.iloc[start:start + chunk_size])
+            loaded.append(drop_seen_fragrances(chunk, seen_urls, seen_name_brands))
+        result = pd.concat(loaded)
+
+        assert result['url'].is_unique
+        assert not result[['name', 'brand_name']].duplicated().any()
+        assert seen_urls == set(result['url'])
+        assert seen_name_brands == set(zip(result['name'], result['brand_name']))
+
+    def test_single_chunk_matches_transform(self):
+        transformed = transform_data(raw_frame())
+        pd.testing.assert_frame_equal(drop_seen_fragrances(transformed, set(), set()), transformed)
+
+
+class TestFrameRelease:
+    """load_csv_data keeps no reference to a frame it has handed over"""
+
+    @pytest.mark.parametrize('reader', ['duckdb', 'arrow', 'pandas'])
+    @pytest.mark.parametrize('chunksize', [None, 3])
+    def test_caller_can_free_frame(self, tmp_path, monkeypatch, reader, chunksize):
+        use_reader(monkeypatch, reader)
+        write_csv(tmp_path / 'fra_cleaned.csv')
+        monkeypatch.setattr(pipeline, 'Path', lambda _: tmp_path)
+        monkeypatch.setattr(pipeline, 'pq', None)  # no Parquet cache write
+
+        frames = load_csv_data(chunksize)
+        df = next(frames)
+        ref = weakref.ref(df)
+        del df
+        gc.collect()
+
+        # Freed while the generator is still suspended on it
+        assert ref() is None
+        frames.close()
+
+
+class TestEncodingFallback:
+    """A CSV that isn't utf-8 is settled on latin1 before any chunk is handed out"""
+
+    @pytest.fixture
+    def dataset_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(pipeline, 'Path', lambda _: tmp_path)
+        return tmp_path
+
+    def test_csv_decodes(self, tmp_path):
+        csv_file = write_csv(tmp_path / 'fra_cleaned.csv', encoding='latin1')
+        assert not csv_decodes(csv_file, 'utf-8')
+        assert csv_decodes(csv_file, 'latin1')
+        assert csv_decodes(write_csv(tmp_path / 'utf8.csv'), 'utf-8')
+
+    @pytest.mark.parametrize('reader', ['arrow', 'pandas'])
+    @pytest.mark.parametrize('chunksize', [None, 3])
+    def test_read_csv_chunks_as_latin1(self, tmp_path, monkeypatch, reader, chunksize):
+        use_reader(monkeypatch, reader)
+        csv_file = write_csv(tmp_path / 'fra_cleaned.csv', encoding='latin1')
+
+        df = pd.concat(read_csv_chunks(csv_file, 'latin1', chunksize), ignore_index=True)
+
+        assert len(df) == len(ROWS)
+        assert df.loc[1, 'Brand'] == 'hermès'
+
+    @pytest.mark.parametrize('reader', ['duckdb', 'arrow', 'pandas'])
+    @pytest.mark.parametrize('chunksize', [None, 3])
+    def test_load_csv_data_falls_back(self, dataset_dir, monkeypatch, reader, chunksize, capsys):
+        use_reader(monkeypatch, reader)
+        write_csv(dataset_dir / 'fra_cleaned.csv', encoding='latin1')
+
+        chunks = list(load_csv_data(chunksize))
+
+        assert 'Successfully loaded with latin1 encoding' in capsys.readouterr().out
+        assert len(chunks) == (3 if chunksize else 1)
+        df = pd.concat(chunks, ignore_index=True)
+        assert len(df) == len(ROWS)
+        assert df.loc[1, 'Brand'] == 'hermès'
+
+    def test_late_bad_byte_settles_before_first_chunk(self, dataset_dir, monkeypatch):
+        # Only the last line is latin1, so utf-8 would get through every chunk but the last
+        use_reader(monkeypatch, 'duckdb')
+        rows = [row.replace('hermès', 'hermes') for row in ROWS] + [ROWS[1].replace('f.com/2', 'f.com/7')]
+        csv_file = dataset_dir / 'fra_cleaned.csv'
+        csv_file.write_bytes('\n'.join([HEADER] + rows).encode('latin1') + b'\n')
+
+        df = pd.concat(load_csv_data(2), ignore_index=True)
+
+        assert len(df) == len(rows)
+        assert df['Brand'].iloc[-1] == 'hermès'
@@ -0,0 +1,167 @@
+"""
+tests/test_schemas.py
+Request validation and recommender-to-API conversion in app.schemas.frags
+"""
+import uuid
+
+import pytest
+from pydantic import ValidationError
+
+from app.ml.models import Fragrance, RecommendationResult
+from app.schemas.frags import (
+    NotePreferenceInput, RecommendationItem, SimilarityRequest, TargetFragranceInfo,
+    convert_recommendation_to_api, convert_similarity_recommendation_to_api,
+    create_user_profile, similarity_reason,
+)
+
+
+FRAGRANCE_ID = '456e7890-e89b-12d3-a456-426614174001'
+
+
+def make_result(score=0.89):
+    fragrance = Fragrance(
+        id=FRAGRANCE_ID,
+        name='Royal Oud',
+        brand='Creed',
+        notes=['pink pepper', 'rhubarb', 'oud', 'rose', 'sandalwood', 'amber'],
+        top_notes=['pink pepper', 'rhubarb'],
+        middle_notes=['oud', 'rose'],
+        base_notes=['sandalwood', 'amber'],
+        accords=['woody', 'warm spicy', 'fresh'],
+        avg_rating=4.3,
+        num_ratings=1892,
+    )
+    return RecommendationResult(fragrance=fragrance, score=score, explanation={'notes': 0.7})
+
+
+def fragrance_payload():
+    return {
+        'id': uuid.UUID(FRAGRANCE_ID),
+        'name': 'Royal Oud',
+        'brand': 'Creed',
+        'top_notes': ['pink pepper', 'rhubarb'],
+        'middle_notes': ['oud', 'rose'],
+        'base_notes': ['sandalwood', 'amber'],
+        'accords': ['woody', 'warm spicy', 'fresh'],
+        'avg_rating': 4.3,
+        'num_ratings': 1892,
+    }
+
+
+def prefs(**importance):
+    return [NotePreferenceInput(name=name, importance=value) for name, value in importance.items()]
+
+
+class TestSimilarityRequest:
+    """target_fragrance_ids: regex fast path, UUID() fallback and order-preserving dedupe"""
+
+    def test_valid_uuid_string(self):
+        request = SimilarityRequest(target_fragrance_ids=FRAGRANCE_ID)
+        assert request.target_fragrance_ids == FRAGRANCE_ID
+
+    @pytest.mark.parametrize('value', [
+        FRAGRANCE_ID.upper(),
+        '{' + FRAGRANCE_ID + '}',
+        'urn:uuid:' + FRAGRANCE_ID,
+        FRAGRANCE_ID.replace('-', ''),
+    ])
+    def test_other_uuid_spellings(self, value):
+        # Passed through as given, both on their own and in a list
+        assert SimilarityRequest(target_fragrance_ids=value).target_fragrance_ids == value
+        assert SimilarityRequest(target_fragrance_ids=[value]).target_fragrance_ids == [value]
+
+    def test_duplicates_collapse_before_limit(self):
+        ids = [str(uuid.uuid4()) for _ in range(10)]
+        request = SimilarityRequest(target_fragrance_ids=ids + ids[::-1] + [ids[3]])
+
+        assert request.target_fragrance_ids == ids
+
+    def test_more_than_ten_distinct_ids(self):
+        with pytest.raises(ValidationError, match='Maximum 10 fragrances allowed'):
+            SimilarityRequest(target_fragrance_ids=[str(uuid.uuid4()) for _ in range(11)])
+
+    def test_empty_list(self):
+        with pytest.raises(ValidationError, match='At least one fragrance ID required'):
+            SimilarityRequest(target_fragrance_ids=[])
+
+    @pytest.mark.parametrize('value', [
+        'not-a-uuid',
+        FRAGRANCE_ID + '0',
+        'x' + FRAGRANCE_ID,
+        FRAGRANCE_ID[:-1] + 'g',
+        '',
+    ])
+    def test_invalid_ids_rejected(self, value):
+        with pytest.raises(ValidationError, match='Invalid UUID format'):
+            SimilarityRequest(target_fragrance_ids=value)
+        with pytest.raises(ValidationError, match='Invalid UUID format'):
+            SimilarityRequest(target_fragrance_ids=[FRAGRANCE_ID, value])
+
+
+class TestRecommendationConversion:
+    """model_construct converters produce the same payload the validating constructors did"""
+
+    def test_note_based_payload(self):
+        profile = create_user_profile(
+            prefs(Oud=9, rose=6, amber=3, vanilla=10),
+            prefs(fresh=8, WOODY=7, citrus=9),
+        )
+        item = convert_recommendation_to_api(make_result(), 2, profile)
+
+        assert item.model_dump() == {
+            'fragrance': fragrance_payload(),
+            'score': 0.89,
+            'explanation': {
+                # Shared names come back in the fragrance's order; disliked ones never match
+                'primary_reason': 'Matches your preferred style: woody, fresh',
+                'shared_notes': ['oud', 'rose'],
+                'shared_accords': ['woody', 'fresh'],
+                'quality_note': 'Highly rated (4.3/5 from 1,892 reviews)',
+                'similarity_score': 0.89,
+            },
+            'rank': 2,
+        }
+
+    def test_note_based_reason_falls_back(self):
+        notes_only = convert_recommendation_to_api(make_result(), 1, create_user_profile(prefs(rhubarb=8), []))
+        nothing = convert_recommendation_to_api(make_result(), 1, create_user_profile(prefs(rhubarb=4), []))
+
+        assert notes_only.explanation.primary_reason == 'Contains notes you love: rhubarb'
+        assert nothing.explanation.primary_reason == 'Recommended based on your overall preferences'
+        assert nothing.explanation.shared_notes == []
+
+    def test_similarity_payload(self):
+        targets = [
+            TargetFragranceInfo(id=uuid.uuid4(), name='Oud Wood', brand='Tom Ford'),
+            TargetFragranceInfo(id=uuid.uuid4(), name='Aventus', brand='Creed'),
+        ]
+        item = convert_similarity_recommendation_to_api(make_result(0.5), 1, similarity_reason(targets))
+
+        assert item.model_dump() == {
+            'fragrance': fragrance_payload(),
+            'score': 0.5,
+            'explanation': {
+                'primary_reason': 'Similar to Oud Wood and Aventus',
+                'shared_notes': [],
+                'shared_accords': [],
+                'quality_note': 'Highly rated (4.3/5 from 1,892 reviews)',
+                'similarity_score': 0.5,
+            },
+            'rank': 1,
+        }
+
+    def test_similarity_reason(self):
+        targets = [TargetFragranceInfo(id=uuid.uuid4(), name=name, brand='b') for name in 'ABCD']
+
+        assert similarity_reason(targets[:1]) == 'Similar to A'
+        assert similarity_reason(targets[:2]) == 'Similar to A and B'
+        assert similarity_reason(targets) == 'Similar to A, B and 2 others'
+
+    def test_constructed_items_validate(self):
+        # The JSON the API sends round-trips through the validating model unchanged
+        profile = create_user_profile(prefs(oud=9), prefs(woody=8))
+        item = convert_recommendation_to_api(make_result(), 1, profile)
+        payload = item.model_dump(mode='json')
+
+        assert RecommendationItem.model_validate(payload).model_dump(mode='json') == payload
+        assert payload['fragrance']['id'] == FRAGRANCE_ID